@@ -1,5 +1,5 @@
 from fastmcp import FastMCP
-import json
+import functools
 import os
 import sys
 from pathlib import Path
@@ -18,14 +18,24 @@ from server.tools.util.policy_loader import PolicyRegistry
 
 POLICY_ROOT = PROJECT_ROOT / "policy" / "config_cards"
 
-policy_registry = PolicyRegistry(policy_root=str(POLICY_ROOT))
+@functools.lru_cache(maxsize=1)
+def get_policy_registry() -> PolicyRegistry:
+    # Config cards are read on first resource access, not on import
+    return PolicyRegistry(policy_root=str(POLICY_ROOT))
 
 # Create server at module level with standard name for FastMCP Cloud discovery
 mcp = FastMCP("MCP Network Optimizer")
-register_resources(mcp, policy_registry)
+register_resources(mcp, get_policy_registry)
 register_tools(mcp)
 
 def main():
+    # uvloop is optional; it only applies when the server owns its event loop
+    try:
+        import asyncio
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     mcp.run()
 
 if __name__ == "__main__":
@@ -1,6 +1,13 @@
+import asyncio
+import functools
 import json
+import os
+import re
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 from server.tools.planner import render_change_plan
-from server.tools.validator import validate_change_plan
 from server.tools.apply.apply import apply_rendered_plan
 from server.tools.apply.checkpoints import (
     snapshot_checkpoint,
@@ -15,9 +22,10 @@ from server.tools.apply import (
     nft as _apply_nft,
     iptables as _apply_iptables
 )
-from server.tools.validation_metrics import run_full_benchmark
-from server.tools.validation_engine import ValidationEngine
+from server.tools.validation_metrics import run_full_benchmark, quick_latency_test
+from server.tools.validation_engine import ValidationEngine, Decision
 from server.tools.audit_log import get_audit_logger
+from server.tools.util.jsonutil import dumps
 from server.tools.util.shell import (
     check_sudo_access,
     request_sudo_access,
@@ -26,298 +34,323 @@ from server.tools.util.shell import (
 )
 
 
-def register_resources(mcp, policy_registry):
+_LIST_DESCRIPTION = "Available network optimization configuration cards"
+
+# Prebuilt halves of the unknown-card response; only the escaped id is
+# serialised per request
+_NOT_FOUND_PREFIX = '{"error":"Configuration card \''
+_NOT_FOUND_SUFFIX = '\' not found"}'
+
+# Ids that cannot name a card are rejected before any lookup or escaping
+_CARD_ID_RE = re.compile(r"\A[A-Za-z0-9_.\-]{1,64}\Z")
+_BAD_CARD_ID = '{"error":"Invalid configuration card id"}'
+
+# Resources are read by MCP clients, not people, so JSON is compact unless
+# NETMCP_PRETTY_JSON is set
+_PRETTY = bool(os.getenv("NETMCP_PRETTY_JSON"))
+
+# Shared "filters" echo for unfiltered audit searches
+_EMPTY_FILTERS = {"action": None, "checkpoint_id": None, "start_date": None, "end_date": None}
+
+
+def _dumps(obj) -> str:
+    return dumps(obj, indent=_PRETTY)
+
+
+def register_resources(mcp, get_policy_registry):
+    # Serialised responses for every card, rebuilt in one pass whenever the
+    # registry version changes so reads are a dict lookup
+    _blobs = {"ver": None, "list": None, "cards": {}, "bin": {}}
+    
+    def _refresh():
+        registry = get_policy_registry()
+        # Read the version before the cards: a reload that lands in between
+        # only makes the next read rebuild again
+        version = registry.version
+        if _blobs["ver"] != version:
+            # One snapshot of the cards serves the list, the JSON blobs and
+            # the msgpack blobs, without a get() per id
+            cards = tuple(registry.cards.items())
+            _blobs["list"] = _dumps({
+                "description": _LIST_DESCRIPTION,
+                "count": len(cards),
+                "cards": [card_id for card_id, _ in cards]
+            })
+            _blobs["cards"] = {card_id: _dumps(card) for card_id, card in cards}
+            if msgpack is not None:
+                _blobs["bin"] = {
+                    card_id: msgpack.packb(card, use_bin_type=True, default=str)
+                    for card_id, card in cards
+                }
+            _blobs["ver"] = version
+        return _blobs
+    
     @mcp.resource("policy://config_cards/list")
     def get_policy_card_list() -> str:
-        cards = policy_registry.list()
-        return json.dumps({
-            "description": "Available network optimization configuration cards",
-            "count": len(cards),
-            "cards": cards
-        }, indent=2)
+        return _refresh()["list"]
     
     @mcp.resource("policy://config_cards/{card_id}")
     def get_policy_card(card_id: str) -> str:
-        card = policy_registry.get(card_id)
-        if not card:
-            return json.dumps({"error": f"Configuration card '{card_id}' not found"})
-        return json.dumps(card, indent=2)
+        if not _CARD_ID_RE.match(card_id):
+            return _BAD_CARD_ID
+        buf = _refresh()["cards"].get(card_id)
+        if buf is None:
+            return _NOT_FOUND_PREFIX + json.dumps(card_id)[1:-1] + _NOT_FOUND_SUFFIX
+        return buf
+    
+    # Optional msgpack encoding of the same cards for clients that can decode it
+    if msgpack is not None:
+        @mcp.resource("policy://config_cards_bin/{card_id}", mime_type="application/msgpack")
+        def get_policy_card_msgpack(card_id: str) -> bytes:
+            if not _CARD_ID_RE.match(card_id):
+                return msgpack.packb({"error": "Invalid configuration card id"})
+            buf = _refresh()["bin"].get(card_id)
+            if buf is None:
+                return msgpack.packb({"error": f"Configuration card '{card_id}' not found"})
+            return buf
+
+
+def _validate_change_plan(parameter_plan: dict) -> dict:
+    # The validator builds pydantic models and reads validation limits on
+    # import, so it is only loaded the first time a plan is validated
+    from server.tools.validator import validate_change_plan
+    return validate_change_plan(parameter_plan)
+
+
+def _in_thread(func):
+    # Tools block on subprocesses (traceroute and iwlist for up to 20 s,
+    # pings, sudo, rollbacks) or file reads; run them on a worker thread so
+    # the event loop keeps serving other requests whatever FastMCP version
+    # dispatches sync tools inline.
+    # functools.wraps keeps the signature FastMCP builds the schema from.
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
+
+
+# Tools that forward their arguments unchanged are registered straight from
+# these tables instead of through a wrapper function each
+_CORE_TOOLS = (
+    ("render_change_plan_tool", render_change_plan),
+    ("validate_change_plan_tool", _validate_change_plan),
+    ("apply_rendered_plan_tool", apply_rendered_plan),
+    ("snapshot_checkpoint_tool", snapshot_checkpoint),
+    ("rollback_to_checkpoint_tool", rollback_to_checkpoint),
+    ("list_checkpoints_tool", list_checkpoints),
+    ("delete_checkpoint_tool", delete_checkpoint),
+    ("test_network_performance_tool", run_full_benchmark),
+)
+
+_DISCOVERY_TOOLS = tuple((name, getattr(_disc, name)) for name in _disc.PROBES + ("discover_all",))
+
+_APPLY_TOOLS = (
+    ("set_sysctl", _apply_sysctl.set_sysctl),
+    ("apply_tc_script", _apply_tc.apply_tc_script),
+    ("apply_nft_ruleset", _apply_nft.apply_nft_ruleset),
+)
+
+
+def _on_rollback(result: dict, checkpoint_id: str, auto_rollback: bool) -> str:
+    if not auto_rollback:
+        return "NO_ACTION"
+    rollback_result = rollback_to_checkpoint(checkpoint_id)
+    result["rollback_result"] = rollback_result
+    if rollback_result.get("ok"):
+        result["message"] = "Configuration rolled back due to performance degradation"
+        return "ROLLED_BACK"
+    result["message"] = "Rollback attempted but failed - manual intervention required"
+    return "ROLLBACK_FAILED"
+
+
+def _on_keep(result: dict, checkpoint_id: str, auto_rollback: bool) -> str:
+    result["message"] = "Configuration changes kept - performance improved"
+    return "KEPT"
+
+
+def _on_uncertain(result: dict, checkpoint_id: str, auto_rollback: bool) -> str:
+    result["message"] = "Configuration kept but results uncertain - manual review recommended"
+    return "KEPT"
+
+
+# auto_validate_and_rollback_tool handlers by validation decision; each sets
+# the result message and returns the action taken
+_DECISION_HANDLERS = {
+    Decision.ROLLBACK: _on_rollback,
+    Decision.KEEP: _on_keep,
+    Decision.UNCERTAIN: _on_uncertain,
+}
 
 
-def register_tools(mcp):
-    
 # Sudo/Privileges Management Tools
-    
-    @mcp.tool()
-    def check_sudo_access_tool() -> dict:
-        """
-        Check if sudo (root) access is available for running privileged network commands.
-        Returns whether passwordless sudo is configured or if credentials are cached.
-        """
-        return check_sudo_access()
-    
-    @mcp.tool()
-    def request_sudo_access_tool(password: str = None) -> dict:
-        """
-        Request sudo access by authenticating with password.
-        Once authenticated, credentials are cached for ~15 minutes.
-        For permanent access, user should run ./setup_sudo.sh instead.
-        
-        Args:
-            password: User's sudo password. Required for authentication.
-        
-        Returns:
-            Success status and cache duration info.
-        """
-        return request_sudo_access(password)
-    
-    @mcp.tool()
-    def extend_sudo_cache_tool() -> dict:
-        """
-        Extend the sudo credential cache to prevent timeout during long operations.
-        Call this periodically (every 10-14 minutes) during extended sessions.
-        """
-        return extend_sudo_cache()
-    
-    @mcp.tool()
-    def get_sudo_setup_instructions_tool() -> dict:
-        """
-        Get instructions for setting up permanent passwordless sudo access.
-        This is the recommended approach for regular use.
-        """
-        return {
-            "instructions": [
-                "For permanent passwordless sudo access, run the setup script:",
-                "",
-                "  ./setup_sudo.sh",
-                "",
-                "This will configure your system to allow the MCP server to run",
-                "network configuration commands (sysctl, tc, nft, etc.) without",
-                "requiring a password each time.",
-                "",
-                "The script only grants access to specific network tools, not full root."
-            ],
-            "alternative": "Or use request_sudo_access_tool with your password for temporary access (~15 min)",
-            "is_configured": is_sudo_configured()
+
+def check_sudo_access_tool() -> dict:
+    """
+    Check if sudo (root) access is available for running privileged network commands.
+    Returns whether passwordless sudo is configured or if credentials are cached.
+    """
+    return check_sudo_access()
+
+
+def request_sudo_access_tool(password: str = None) -> dict:
+    """
+    Request sudo access by authenticating with password.
+    Once authenticated, credentials are cached for ~15 minutes.
+    For permanent access, user should run ./setup_sudo.sh instead.
+
+    Args:
+        password: User's sudo password. Required for authentication.
+
+    Returns:
+        Success status and cache duration info.
+    """
+    return request_sudo_access(password)
+
+
+def extend_sudo_cache_tool() -> dict:
+    """
+    Extend the sudo credential cache to prevent timeout during long operations.
+    Call this periodically (every 10-14 minutes) during extended sessions.
+    """
+    return extend_sudo_cache()
+
+
+def get_sudo_setup_instructions_tool() -> dict:
+    """
+    Get instructions for setting up permanent passwordless sudo access.
+    This is the recommended approach for regular use.
+    """
+    return {
+        "instructions": [
+            "For permanent passwordless sudo access, run the setup script:",
+            "",
+            "  ./setup_sudo.sh",
+            "",
+            "This will configure your system to allow the MCP server to run",
+            "network configuration commands (sysctl, tc, nft, etc.) without",
+            "requiring a password each time.",
+            "",
+            "The script only grants access to specific network tools, not full root."
+        ],
+        "alternative": "Or use request_sudo_access_tool with your password for temporary access (~15 min)",
+        "is_configured": is_sudo_configured()
+    }
+
+
+# Validation Tools
+
+def quick_latency_test_tool() -> dict:
+    return quick_latency_test()
+
+
+def validate_configuration_changes_tool(
+    before_results: dict,
+    after_results: dict,
+    profile: str = "gaming"
+) -> dict:
+    return ValidationEngine.compare_benchmarks(before_results, after_results, profile)
+
+
+def auto_validate_and_rollback_tool(
+    checkpoint_id: str,
+    before_results: dict,
+    after_results: dict,
+    profile: str = "gaming",
+    auto_rollback: bool = True
+) -> dict:
+    validation = ValidationEngine.compare_benchmarks(before_results, after_results, profile)
+
+    result = {"validation": validation}
+    handler = _DECISION_HANDLERS.get(validation["decision"])
+    action_taken = handler(result, checkpoint_id, auto_rollback) if handler else "NO_ACTION"
+
+    result["action_taken"] = action_taken
+    return result
+
+
+# Audit Logging Tools
+
+def get_audit_log_tool(limit: int = 50) -> dict:
+    logger = get_audit_logger()
+    entries = logger.get_recent_entries(limit)
+
+    return {
+        "ok": True,
+        "count": len(entries),
+        "entries": entries
+    }
+
+
+def search_audit_log_tool(
+    action: str = None,
+    checkpoint_id: str = None,
+    start_date: str = None,
+    end_date: str = None
+) -> dict:
+    logger = get_audit_logger()
+    entries = logger.search_entries(action, checkpoint_id, start_date, end_date)
+
+    if action is None and checkpoint_id is None and start_date is None and end_date is None:
+        filters = _EMPTY_FILTERS
+    else:
+        filters = {
+            "action": action,
+            "checkpoint_id": checkpoint_id,
+            "start_date": start_date,
+            "end_date": end_date
         }
 
-# Core Plan Tools
-    
-    @mcp.tool()
-    def render_change_plan_tool(plan: dict) -> dict:
-        return render_change_plan(plan)
-    
-    @mcp.tool()
-    def validate_change_plan_tool(parameter_plan: dict) -> dict:
-        return validate_change_plan(parameter_plan)
-    
-    @mcp.tool()
-    def apply_rendered_plan_tool(rendered_plan: dict, checkpoint_label: str = None) -> dict:
-        return apply_rendered_plan(rendered_plan, checkpoint_label)
+    return {
+        "ok": True,
+        "count": len(entries),
+        "filters": filters,
+        "entries": entries
+    }
 
-    @mcp.tool()
-    def snapshot_checkpoint_tool(label: str = None) -> dict:
-        return snapshot_checkpoint(label)
-    
-    @mcp.tool()
-    def rollback_to_checkpoint_tool(checkpoint_id: str) -> dict:
-        return rollback_to_checkpoint(checkpoint_id)
-    
-    @mcp.tool()
-    def list_checkpoints_tool() -> dict:
-        return list_checkpoints()
-    
-    @mcp.tool()
-    def delete_checkpoint_tool(checkpoint_id: str) -> dict:
-        return delete_checkpoint(checkpoint_id)
-    
-    @mcp.tool()
-    def test_network_performance_tool(profile: str = "gaming") -> dict:
-        return run_full_benchmark(profile)
-    
-    @mcp.tool()
-    def quick_latency_test_tool() -> dict:
-        from server.tools.validation_metrics import quick_latency_test
-        return quick_latency_test()
-    
-    @mcp.tool()
-    def validate_configuration_changes_tool(
-        before_results: dict,
-        after_results: dict,
-        profile: str = "gaming"
-    ) -> dict:
-        return ValidationEngine.compare_benchmarks(before_results, after_results, profile)
-    
-    @mcp.tool()
-    def auto_validate_and_rollback_tool(
-        checkpoint_id: str,
-        before_results: dict,
-        after_results: dict,
-        profile: str = "gaming",
-        auto_rollback: bool = True
-    ) -> dict:
-        from server.tools.validation_engine import ValidationEngine
-        
-        validation = ValidationEngine.compare_benchmarks(before_results, after_results, profile)
-        
-        action_taken = "NO_ACTION"
-        result = {"validation": validation}
-        
-        if validation["decision"] == "ROLLBACK" and auto_rollback:
-            rollback_result = rollback_to_checkpoint(checkpoint_id)
-            result["rollback_result"] = rollback_result
-            if rollback_result.get("ok"):
-                action_taken = "ROLLED_BACK"
-                result["message"] = "Configuration rolled back due to performance degradation"
-            else:
-                action_taken = "ROLLBACK_FAILED"
-                result["message"] = "Rollback attempted but failed - manual intervention required"
-        elif validation["decision"] == "KEEP":
-            action_taken = "KEPT"
-            result["message"] = "Configuration changes kept - performance improved"
-        elif validation["decision"] == "UNCERTAIN":
-            action_taken = "KEPT"
-            result["message"] = "Configuration kept but results uncertain - manual review recommended"
-        
-        result["action_taken"] = action_taken
-        return result
-    
-# Discovery Tools
-    
-    @mcp.tool()
-    def ip_info() -> dict:
-        return _disc.ip_info()
-    
-    @mcp.tool()
-    def eth_info(iface: str = "eth0") -> dict:
-        return _disc.eth_info(iface)
-    
-    @mcp.tool()
-    def hostname_ips() -> dict:
-        return _disc.hostname_ips()
-    
-    @mcp.tool()
-    def hostnamectl() -> dict:
-        return _disc.hostnamectl()
-    
-    @mcp.tool()
-    def nmcli_status() -> dict:
-        return _disc.nmcli_status()
-    
-    @mcp.tool()
-    def iwconfig(iface: str = "wlan0") -> dict:
-        return _disc.iwconfig(iface)
-    
-    @mcp.tool()
-    def iwlist_scan(iface: str = "wlan0", subcmd: str = "scan") -> dict:
-        return _disc.iwlist_scan(iface, subcmd)
-    
-    @mcp.tool()
-    def arp_table() -> dict:
-        return _disc.arp_table()
-    
-    @mcp.tool()
-    def ip_neigh() -> dict:
-        return _disc.ip_neigh()
-    
-    @mcp.tool()
-    def ip_route() -> dict:
-        return _disc.ip_route()
-    
-    @mcp.tool()
-    def resolvectl_status() -> dict:
-        return _disc.resolvectl_status()
-    
-    @mcp.tool()
-    def cat_resolv_conf() -> dict:
-        return _disc.cat_resolv_conf()
-    
-    @mcp.tool()
-    def dig(domain: str, dns: str | None = None) -> dict:
-        return _disc.dig(domain, dns)
-    
-    @mcp.tool()
-    def host(domain: str) -> dict:
-        return _disc.host(domain)
-    
-    @mcp.tool()
-    def nslookup(domain: str) -> dict:
-        return _disc.nslookup(domain)
-    
-    @mcp.tool()
-    def ping_host(address: str, count: int = 3) -> dict:
-        return _disc.ping_host(address, count)
-    
-    @mcp.tool()
-    def traceroute(domain: str) -> dict:
-        return _disc.traceroute(domain)
-    
-    @mcp.tool()
-    def tracepath(domain: str) -> dict:
-        return _disc.tracepath(domain)
-    
-    @mcp.tool()
-    def ss_summary(options: str = "tulwn") -> dict:
-        return _disc.ss_summary(options)
-    
-    @mcp.tool()
-    def tc_qdisc_show(iface: str) -> dict:
-        return _disc.tc_qdisc_show(iface)
+
+# Tools with their own bodies are registered under their function names;
+# the groups keep the order clients see in the tool list
+_SUDO_TOOLS = (
+    check_sudo_access_tool,
+    request_sudo_access_tool,
+    extend_sudo_cache_tool,
+    get_sudo_setup_instructions_tool,
+)
+
+_VALIDATION_TOOLS = (
+    quick_latency_test_tool,
+    validate_configuration_changes_tool,
+    auto_validate_and_rollback_tool,
+)
+
+_AUDIT_TOOLS = (
+    get_audit_log_tool,
+    search_audit_log_tool,
+)
+
+
+def register_tools(mcp):
+    tool = mcp.tool
     
-    @mcp.tool()
-    def nft_list_ruleset() -> dict:
-        return _disc.nft_list_ruleset()
+# Sudo/Privileges Management Tools
     
-    @mcp.tool()
-    def iptables_list() -> dict:
-        return _disc.iptables_list()
+    for func in _SUDO_TOOLS:
+        tool()(_in_thread(func))
+
+# Core Plan Tools
     
-# Applying Tools
+    for name, func in _CORE_TOOLS:
+        tool(name=name)(_in_thread(func))
     
-    @mcp.tool()
-    def set_sysctl(kv: dict[str, str]) -> dict:
-        return _apply_sysctl.set_sysctl(kv)
+    for func in _VALIDATION_TOOLS:
+        tool()(_in_thread(func))
     
-    @mcp.tool()
-    def apply_tc_script(lines: list[str]) -> dict:
-        return _apply_tc.apply_tc_script(lines)
+# Discovery and Applying Tools
     
-    @mcp.tool()
-    def apply_nft_ruleset(ruleset: str) -> dict:
-        return _apply_nft.apply_nft_ruleset(ruleset)
+    for name, func in _DISCOVERY_TOOLS + _APPLY_TOOLS:
+        tool(name=name)(_in_thread(func))
     
 # AUDIT LOGGING
     
-    @mcp.tool()
-    def get_audit_log_tool(limit: int = 50) -> dict:
-        logger = get_audit_logger()
-        entries = logger.get_recent_entries(limit)
-        
-        return {
-            "ok": True,
-            "count": len(entries),
-            "entries": entries
-        }
-    
-    @mcp.tool()
-    def search_audit_log_tool(
-        action: str = None,
-        checkpoint_id: str = None,
-        start_date: str = None,
-        end_date: str = None
-    ) -> dict:
-        logger = get_audit_logger()
-        entries = logger.search_entries(action, checkpoint_id, start_date, end_date)
-        
-        return {
-            "ok": True,
-            "count": len(entries),
-            "filters": {
-                "action": action,
-                "checkpoint_id": checkpoint_id,
-                "start_date": start_date,
-                "end_date": end_date
-            },
-            "entries": entries
-        }
-
+    for func in _AUDIT_TOOLS:
+        tool()(_in_thread(func))
@@ -1,13 +1,17 @@
-from server.schema.models import RenderedPlan, ChangeReport
 from server.tools.apply.checkpoints import snapshot_checkpoint, rollback_to_checkpoint
 from server.tools.util.shell import run
+from server.tools.util.cache import invalidate_all
 from server.tools.apply import nft as apply_nft
 from server.tools.audit_log import log_checkpoint_creation, log_command_execution, log_plan_application
+import functools
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 
-def apply_rendered_plan(rendered_plan: dict, checkpoint_label: str | None = None) -> dict:
+def apply_rendered_plan(rendered_plan: dict, checkpoint_label: str | None = None, parallel: bool = False) -> dict:
+    from server.schema.models import RenderedPlan
+    
     try:
         plan = RenderedPlan(**rendered_plan)
     except Exception as e:
@@ -20,6 +24,7 @@ def apply_rendered_plan(rendered_plan: dict, checkpoint_label: str | None = None
             "notes": ["Validation failed"]
         }
     
+    invalidate_all()
     errors = []
     notes = []
     checkpoint_id = None
@@ -46,79 +51,31 @@ def apply_rendered_plan(rendered_plan: dict, checkpoint_label: str | None = None
     applied_steps = []
     
     try:
-        # 1. Apply sysctl commands
+        steps = []
         if plan.sysctl_cmds:
-            notes.append(f"Applying {len(plan.sysctl_cmds)} sysctl commands")
-            for cmd in plan.sysctl_cmds:
-                # Parse sysctl command: "sysctl -w key=value"
-                parts = cmd.split()
-                if len(parts) >= 3 and parts[0] == "sysctl" and parts[1] == "-w":
-                    r = run(["sysctl", "-w", parts[2]], timeout=10)
-                    
-                    # Log command execution
-                    log_command_execution(
-                        ["sysctl", "-w", parts[2]],
-                        r.get("ok"),
-                        r.get("stdout", ""),
-                        r.get("stderr", ""),
-                        checkpoint_id
-                    )
-                    
-                    if not r.get("ok"):
-                        errors.append(f"sysctl failed: {cmd} - {r.get('stderr','')}\n{r.get('stdout','')}")
-                        raise RuntimeError("sysctl command failed")
-                    applied_steps.append(("sysctl", cmd))
-                    notes.append(f"✓ {cmd}")
-                else:
-                    errors.append(f"Invalid sysctl command format: {cmd}")
-                    raise ValueError(f"Invalid sysctl command format: {cmd}")
-        
-        # 2. Apply tc script
+            steps.append(functools.partial(_apply_sysctl_cmds, plan.sysctl_cmds))
         if plan.tc_script and plan.tc_script.strip():
-            notes.append("Applying tc script")
-            # Execute lines deterministically via allowlisted runner
-            for raw in plan.tc_script.splitlines():
-                line = raw.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = line.split()
-                r = run(parts, timeout=10)
-                
-                # Log command execution
-                log_command_execution(
-                    parts,
-                    r.get("ok"),
-                    r.get("stdout", ""),
-                    r.get("stderr", ""),
-                    checkpoint_id
-                )
-                
-                if not r.get("ok"):
-                    errors.append(f"tc failed: {line} - {r.get('stderr','')}")
-                    raise RuntimeError("tc command failed")
-                notes.append(f"✓ {line}")
-            applied_steps.append(("tc", "script"))
-            notes.append("✓ tc script applied successfully")
-        
-        # 3. Apply nftables script
+            steps.append(functools.partial(_apply_tc_script, plan.tc_script))
         if plan.nft_script and plan.nft_script.strip():
-            notes.append("Applying nftables script")
-            r = apply_nft.apply_nft_ruleset(plan.nft_script)
-            
-            # Log nftables execution
-            log_command_execution(
-                ["nft", "-f", "<script>"],
-                r.get("ok"),
-                r.get("stdout", ""),
-                r.get("stderr", ""),
-                checkpoint_id
-            )
-            
-            if not r.get("ok"):
-                errors.append(f"nftables script failed: {r.get('stderr','')}")
-                raise RuntimeError("nft apply failed")
-            applied_steps.append(("nft", "script"))
-            notes.append("✓ nftables script applied successfully")
+            steps.append(functools.partial(_apply_nft_script, plan.nft_script))
+        
+        if parallel and len(steps) > 1:
+            # sysctl, tc and nftables touch independent kernel subsystems, so
+            # their groups can run side by side; any failure still rolls back
+            # the whole plan below
+            outputs = [([], [], []) for _ in steps]
+            with ThreadPoolExecutor(max_workers=len(steps)) as pool:
+                futures = [pool.submit(step, checkpoint_id, *out) for step, out in zip(steps, outputs)]
+            for step_notes, step_errors, step_applied in outputs:
+                notes.extend(step_notes)
+                errors.extend(step_errors)
+                applied_steps.extend(step_applied)
+            failures = [f.exception() for f in futures if f.exception() is not None]
+            if failures:
+                raise failures[0]
+        else:
+            for step in steps:
+                step(checkpoint_id, notes, errors, applied_steps)
         
         # Success
         notes.append(f"All changes applied successfully ({len(applied_steps)} operations)")
@@ -165,4 +122,78 @@ def apply_rendered_plan(rendered_plan: dict, checkpoint_label: str | None = None
         # Log the failed plan application
         log_plan_application(rendered_plan, change_report, checkpoint_id)
         
-        return change_report
\ No newline at end of file
+        return change_report
+
+
+def _apply_sysctl_cmds(cmds, checkpoint_id, notes, errors, applied_steps):
+    notes.append(f"Applying {len(cmds)} sysctl commands")
+    for cmd in cmds:
+        # Parse sysctl command: "sysctl -w key=value"
+        parts = cmd.split()
+        if len(parts) >= 3 and parts[0] == "sysctl" and parts[1] == "-w":
+            r = run(["sysctl", "-w", parts[2]], timeout=10)
+            
+            # Log command execution
+            log_command_execution(
+                ["sysctl", "-w", parts[2]],
+                r.get("ok"),
+                r.get("stdout", ""),
+                r.get("stderr", ""),
+                checkpoint_id
+            )
+            
+            if not r.get("ok"):
+                errors.append(f"sysctl failed: {cmd} - {r.get('stderr','')}\n{r.get('stdout','')}")
+                raise RuntimeError("sysctl command failed")
+            applied_steps.append(("sysctl", cmd))
+            notes.append(f"✓ {cmd}")
+        else:
+            errors.append(f"Invalid sysctl command format: {cmd}")
+            raise ValueError(f"Invalid sysctl command format: {cmd}")
+
+
+def _apply_tc_script(script, checkpoint_id, notes, errors, applied_steps):
+    notes.append("Applying tc script")
+    # Execute lines deterministically via allowlisted runner
+    for raw in script.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        r = run(parts, timeout=10)
+        
+        # Log command execution
+        log_command_execution(
+            parts,
+            r.get("ok"),
+            r.get("stdout", ""),
+            r.get("stderr", ""),
+            checkpoint_id
+        )
+        
+        if not r.get("ok"):
+            errors.append(f"tc failed: {line} - {r.get('stderr','')}")
+            raise RuntimeError("tc command failed")
+        notes.append(f"✓ {line}")
+    applied_steps.append(("tc", "script"))
+    notes.append("✓ tc script applied successfully")
+
+
+def _apply_nft_script(script, checkpoint_id, notes, errors, applied_steps):
+    notes.append("Applying nftables script")
+    r = apply_nft.apply_nft_ruleset(script)
+    
+    # Log nftables execution
+    log_command_execution(
+        ["nft", "-f", "<script>"],
+        r.get("ok"),
+        r.get("stdout", ""),
+        r.get("stderr", ""),
+        checkpoint_id
+    )
+    
+    if not r.get("ok"):
+        errors.append(f"nftables script failed: {r.get('stderr','')}")
+        raise RuntimeError("nft apply failed")
+    applied_steps.append(("nft", "script"))
+    notes.append("✓ nftables script applied successfully")
@@ -1,14 +1,50 @@
+import hashlib
 import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 from server.tools.util.shell import run, run_privileged
+from server.tools.util.cache import invalidate_all
 from server.tools.audit_log import log_rollback
 
 
 # Checkpoint storage location
 CHECKPOINT_DIR = Path.home() / ".mcp-net-optimizer" / "checkpoints"
 
+# In-memory checkpoints for short-lived validate/rollback loops, kept as
+# id -> (metadata, state) and evicted least recently used first
+MEMORY_PREFIX = "mem:"
+MEMORY_CHECKPOINT_LIMIT = 64
+_memory_checkpoints: "OrderedDict[str, tuple[dict, Dict[str, str]]]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+# Checkpoint files rollback knows how to restore from
+_ARTIFACTS = ("sysctl.conf", "tc_config.json", "nft_ruleset.txt", "ethtool_settings.json", "ip_link.txt")
+
+# Read-only or problematic sysctls that rollback does not try to restore
+_SYSCTL_SKIP_PATTERNS = (
+    "kernel.random",
+    "kernel.ns_last_pid",
+    "fs.inode-state",
+    "fs.file-",
+    "kernel.pty.nr",
+    "kernel.sched_domain",
+    "dev.cdrom",
+    "kernel.core_pipe_limit"
+)
+
+# Live sysctl values and MTUs are read from here without a subprocess
+_PROC_SYS = Path("/proc/sys")
+_SYS_NET = Path("/sys/class/net")
+
+# sysctl names use "." as separator and "/" for dots inside a component
+# (e.g. VLAN interfaces); /proc/sys paths are the other way round
+_SYSCTL_TO_PATH = str.maketrans("./", "/.")
+
 
 def _ensure_checkpoint_dir():
     """Create checkpoint directory if it doesn't exist."""
@@ -31,105 +67,282 @@ def _run_command(cmd: List[str], use_sudo: bool = False) -> tuple[bool, str, str
     return (result["ok"], result["stdout"], result["stderr"])
 
 
-def snapshot_checkpoint(label: str | None = None) -> dict:
-    try:
-        _ensure_checkpoint_dir()
+def _capture_state() -> tuple[Dict[str, str], List[str], List[str]]:
+    """
+    Capture the current network configuration.
+    
+    Returns ({checkpoint file name: contents}, notes, errors).
+    """
+    state = {}
+    notes = []
+    errors = []
+    interfaces = []
+    
+    # 1. Save sysctl settings
+    success, stdout, stderr = _run_command(["sysctl", "-a"])
+    if success:
+        state["sysctl.conf"] = stdout
+        notes.append("✓ Saved sysctl settings")
+    else:
+        errors.append(f"Failed to save sysctl: {stderr}")
+    
+    # 2. Save tc (traffic control) configuration
+    tc_data = {}
+    
+    # Get list of interfaces
+    success, stdout, stderr = _run_command(["ip", "link", "show"])
+    if success:
+        for line in stdout.split("\n"):
+            if ":" in line and not line.startswith(" "):
+                parts = line.split(":")
+                if len(parts) >= 2:
+                    iface = parts[1].strip().split("@")[0]
+                    if iface and iface not in ["lo"]:
+                        interfaces.append(iface)
         
-        # Generate checkpoint ID with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        checkpoint_id = f"checkpoint-{timestamp}"
-        checkpoint_path = CHECKPOINT_DIR / checkpoint_id
-        checkpoint_path.mkdir(exist_ok=True)
+        # Save tc qdisc for each interface
+        for iface in interfaces:
+            success, stdout, stderr = _run_command(["tc", "qdisc", "show", "dev", iface])
+            if success:
+                tc_data[f"{iface}_qdisc"] = stdout
+            
+            success, stdout, stderr = _run_command(["tc", "class", "show", "dev", iface])
+            if success:
+                tc_data[f"{iface}_class"] = stdout
+            
+            success, stdout, stderr = _run_command(["tc", "filter", "show", "dev", iface])
+            if success:
+                tc_data[f"{iface}_filter"] = stdout
         
-        notes = []
-        errors = []
+        state["tc_config.json"] = json.dumps(tc_data, indent=2)
+        notes.append(f"✓ Saved tc config for {len(interfaces)} interfaces")
+    
+    # 3. Save nftables rules
+    success, stdout, stderr = _run_command(["nft", "list", "ruleset"])
+    if success:
+        state["nft_ruleset.txt"] = stdout
+        notes.append("✓ Saved nftables ruleset")
+    elif "No such file" not in stderr:
+        errors.append(f"nft not available: {stderr}")
+    
+    # 4. Save ethtool settings for each interface
+    if success:  # Reuse interface list from tc step
+        ethtool_data = {}
+        for iface in interfaces:
+            # Get offload settings
+            success, stdout, stderr = _run_command(["ethtool", "-k", iface])
+            if success:
+                ethtool_data[f"{iface}_offloads"] = stdout
+            
+            # Get interface info
+            success, stdout, stderr = _run_command(["ethtool", iface])
+            if success:
+                ethtool_data[f"{iface}_info"] = stdout
         
-        # 1. Save sysctl settings
-        success, stdout, stderr = _run_command(["sysctl", "-a"])
-        if success:
-            (checkpoint_path / "sysctl.conf").write_text(stdout)
-            notes.append("✓ Saved sysctl settings")
+        if ethtool_data:
+            state["ethtool_settings.json"] = json.dumps(ethtool_data, indent=2)
+            notes.append(f"✓ Saved ethtool settings for {len(interfaces)} interfaces")
+    
+    # 5. Save interface configuration (MTU, state, etc.)
+    success, stdout, stderr = _run_command(["ip", "link", "show"])
+    if success:
+        state["ip_link.txt"] = stdout
+        notes.append("✓ Saved interface configuration")
+    
+    # 6. Save ip address configuration
+    success, stdout, stderr = _run_command(["ip", "addr", "show"])
+    if success:
+        state["ip_addr.txt"] = stdout
+    
+    return state, notes, errors
+
+
+def _restorable_sysctls(content: str):
+    """Yield (key, value) for each saved sysctl that rollback restores."""
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        
+        # Parse: key = value or key=value
+        if " = " in line:
+            key, value = line.split(" = ", 1)
         else:
-            errors.append(f"Failed to save sysctl: {stderr}")
+            key, value = line.split("=", 1)
         
-        # 2. Save tc (traffic control) configuration
-        tc_data = {}
+        key = key.strip()
         
-        # Get list of interfaces
-        success, stdout, stderr = _run_command(["ip", "link", "show"])
-        if success:
-            interfaces = []
-            for line in stdout.split("\n"):
-                if ":" in line and not line.startswith(" "):
-                    parts = line.split(":")
-                    if len(parts) >= 2:
-                        iface = parts[1].strip().split("@")[0]
-                        if iface and iface not in ["lo"]:
-                            interfaces.append(iface)
-            
-            # Save tc qdisc for each interface
-            for iface in interfaces:
-                success, stdout, stderr = _run_command(["tc", "qdisc", "show", "dev", iface])
-                if success:
-                    tc_data[f"{iface}_qdisc"] = stdout
-                
-                success, stdout, stderr = _run_command(["tc", "class", "show", "dev", iface])
-                if success:
-                    tc_data[f"{iface}_class"] = stdout
-                
-                success, stdout, stderr = _run_command(["tc", "filter", "show", "dev", iface])
-                if success:
-                    tc_data[f"{iface}_filter"] = stdout
-            
-            (checkpoint_path / "tc_config.json").write_text(json.dumps(tc_data, indent=2))
-            notes.append(f"✓ Saved tc config for {len(interfaces)} interfaces")
-        
-        # 3. Save nftables rules
-        success, stdout, stderr = _run_command(["nft", "list", "ruleset"])
-        if success:
-            (checkpoint_path / "nft_ruleset.txt").write_text(stdout)
-            notes.append("✓ Saved nftables ruleset")
-        elif "No such file" not in stderr:
-            errors.append(f"nft not available: {stderr}")
+        # Skip read-only or problematic sysctls
+        if any(pattern in key for pattern in _SYSCTL_SKIP_PATTERNS):
+            continue
         
-        # 4. Save ethtool settings for each interface
-        if success:  # Reuse interface list from tc step
-            ethtool_data = {}
-            for iface in interfaces:
-                # Get offload settings
-                success, stdout, stderr = _run_command(["ethtool", "-k", iface])
-                if success:
-                    ethtool_data[f"{iface}_offloads"] = stdout
-                
-                # Get interface info
-                success, stdout, stderr = _run_command(["ethtool", iface])
-                if success:
-                    ethtool_data[f"{iface}_info"] = stdout
-            
-            if ethtool_data:
-                (checkpoint_path / "ethtool_settings.json").write_text(json.dumps(ethtool_data, indent=2))
-                notes.append(f"✓ Saved ethtool settings for {len(interfaces)} interfaces")
+        yield key, value.strip()
+
+
+def _mtus(ip_link_content: str) -> Dict[str, str]:
+    """Map interface name to MTU from saved `ip link show` output."""
+    mtus = {}
+    for line in ip_link_content.split("\n"):
+        if "mtu " in line and ":" in line:
+            parts = line.split()
+            if "mtu" in parts and parts.index("mtu") + 1 < len(parts):
+                mtus[parts[1].rstrip(":").split("@")[0]] = parts[parts.index("mtu") + 1]
+    return mtus
+
+
+def _state_matches(state: Dict[str, str]) -> bool:
+    """
+    Check whether the live configuration already equals everything rollback
+    would restore from `state`.
+    
+    Checks run cheapest first and stop at the first difference: sysctls and
+    MTUs are read from /proc and /sys, then nft, tc and ethtool are queried.
+    After a real change this usually returns within the sysctl pass, without
+    spawning anything.
+    """
+    if "sysctl.conf" not in state:
+        return False
+    
+    try:
+        for key, value in _restorable_sysctls(state["sysctl.conf"]):
+            path = _PROC_SYS / key.translate(_SYSCTL_TO_PATH)
+            # Read-only entries (counters, ids) can't be restored either
+            if not path.stat().st_mode & 0o222:
+                continue
+            if path.read_text().split() != value.split():
+                return False
         
-        # 5. Save interface configuration (MTU, state, etc.)
-        success, stdout, stderr = _run_command(["ip", "link", "show"])
-        if success:
-            (checkpoint_path / "ip_link.txt").write_text(stdout)
-            notes.append("✓ Saved interface configuration")
+        for iface, mtu in _mtus(state.get("ip_link.txt", "")).items():
+            if (_SYS_NET / iface / "mtu").read_text().strip() != mtu:
+                return False
+    except OSError:
+        return False
+    
+    if "nft_ruleset.txt" in state:
+        success, stdout, _ = _run_command(["nft", "list", "ruleset"])
+        if not success or stdout != state["nft_ruleset.txt"]:
+            return False
+    
+    tc_data = json.loads(state.get("tc_config.json", "{}"))
+    for key, saved in tc_data.items():
+        iface, kind = key.rsplit("_", 1)
+        success, stdout, _ = _run_command(["tc", kind, "show", "dev", iface])
+        if not success or stdout != saved:
+            return False
+    
+    ethtool_data = json.loads(state.get("ethtool_settings.json", "{}"))
+    for key, saved in ethtool_data.items():
+        if key.endswith("_offloads"):
+            success, stdout, _ = _run_command(["ethtool", "-k", key[:-len("_offloads")]])
+            if not success or stdout != saved:
+                return False
+    
+    return True
+
+
+def _previous_checkpoint(current: Path) -> Optional[Path]:
+    """Most recent checkpoint directory other than `current`."""
+    for checkpoint_dir in sorted(CHECKPOINT_DIR.iterdir(), reverse=True):
+        if checkpoint_dir != current and (checkpoint_dir / "metadata.json").exists():
+            return checkpoint_dir
+    return None
+
+
+def _write_artifacts(checkpoint_path: Path, state: Dict[str, str]) -> Dict[str, str]:
+    """
+    Write captured state into a checkpoint directory and return
+    {file name: sha256} for its metadata.
+    
+    Files identical to the previous checkpoint's are hard-linked to it
+    instead of written again; checkpoint files are never modified in place,
+    so sharing the inode is safe.
+    """
+    previous = _previous_checkpoint(checkpoint_path)
+    previous_artifacts = {}
+    if previous is not None:
+        try:
+            previous_artifacts = json.loads((previous / "metadata.json").read_text()).get("artifacts", {})
+        except (OSError, ValueError):
+            pass
+    
+    artifacts = {}
+    for name, content in state.items():
+        data = content.encode()
+        digest = hashlib.sha256(data).hexdigest()
+        artifacts[name] = digest
         
-        # 6. Save ip address configuration
-        success, stdout, stderr = _run_command(["ip", "addr", "show"])
-        if success:
-            (checkpoint_path / "ip_addr.txt").write_text(stdout)
+        target = checkpoint_path / name
+        # Never write through an existing file; it may be linked elsewhere
+        target.unlink(missing_ok=True)
+        if previous_artifacts.get(name) == digest:
+            try:
+                os.link(previous / name, target)
+                continue
+            except OSError:
+                # Missing source, cross-device or no hard link support
+                pass
+        target.write_bytes(data)
+    
+    return artifacts
+
+
+def snapshot_checkpoint(label: str | None = None, mode: str = "disk") -> dict:
+    """
+    Save the current network configuration (sysctl, tc, nftables, ethtool,
+    MTU) so it can be restored with rollback_to_checkpoint_tool.
+    
+    mode="disk" (default) keeps the checkpoint across server restarts.
+    mode="memory" keeps the snapshot in-process for quick validate-and-
+    rollback loops: its id starts with "mem:", it is lost on restart, and
+    the oldest is evicted past 64.
+    """
+    if mode not in ("disk", "memory"):
+        return {
+            "ok": False,
+            "checkpoint_id": None,
+            "notes": [f"Unknown checkpoint mode '{mode}'; use 'disk' or 'memory'"],
+            "errors": [f"invalid mode: {mode}"]
+        }
+    
+    try:
+        # Generate checkpoint ID with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        state, notes, errors = _capture_state()
         
-        # 7. Save metadata
         metadata = {
-            "checkpoint_id": checkpoint_id,
             "timestamp": timestamp,
             "label": label or "Unnamed checkpoint",
             "created_at": datetime.now().isoformat(),
             "notes": notes,
             "errors": errors
         }
+        
+        if mode == "memory":
+            checkpoint_id = f"{MEMORY_PREFIX}{uuid.uuid4().hex}"
+            metadata = {"checkpoint_id": checkpoint_id, "mode": "memory", **metadata}
+            with _memory_lock:
+                _memory_checkpoints[checkpoint_id] = (metadata, state)
+                while len(_memory_checkpoints) > MEMORY_CHECKPOINT_LIMIT:
+                    _memory_checkpoints.popitem(last=False)
+            
+            return {
+                "ok": True,
+                "checkpoint_id": checkpoint_id,
+                "notes": notes,
+                "errors": errors
+            }
+        
+        _ensure_checkpoint_dir()
+        checkpoint_id = f"checkpoint-{timestamp}"
+        checkpoint_path = CHECKPOINT_DIR / checkpoint_id
+        checkpoint_path.mkdir(exist_ok=True)
+        
+        # 7. Save metadata
+        metadata = {
+            "checkpoint_id": checkpoint_id,
+            **metadata,
+            "artifacts": _write_artifacts(checkpoint_path, state)
+        }
         (checkpoint_path / "metadata.json").write_text(json.dumps(metadata, indent=2))
         
         result = {
@@ -155,62 +368,70 @@ def rollback_to_checkpoint(checkpoint_id: str) -> dict:
     if not isinstance(checkpoint_id, str) or not checkpoint_id:
         return {"ok": False, "restored": False, "notes": ["invalid checkpoint_id"]}
     
-    checkpoint_path = CHECKPOINT_DIR / checkpoint_id
-    
-    if not checkpoint_path.exists():
-        return {
-            "ok": False,
-            "restored": False,
-            "notes": [f"Checkpoint '{checkpoint_id}' not found at {checkpoint_path}"]
-        }
+    if checkpoint_id.startswith(MEMORY_PREFIX):
+        with _memory_lock:
+            entry = _memory_checkpoints.get(checkpoint_id)
+            if entry is not None:
+                _memory_checkpoints.move_to_end(checkpoint_id)
+        if entry is None:
+            return {
+                "ok": False,
+                "restored": False,
+                "notes": [f"Checkpoint '{checkpoint_id}' not found in memory (expired or server restarted)"]
+            }
+    else:
+        checkpoint_path = CHECKPOINT_DIR / checkpoint_id
+        
+        if not checkpoint_path.exists():
+            return {
+                "ok": False,
+                "restored": False,
+                "notes": [f"Checkpoint '{checkpoint_id}' not found at {checkpoint_path}"]
+            }
+        entry = None
     
+    invalidate_all()
     notes = []
     errors = []
     
     try:
-        # Load metadata
-        metadata_file = checkpoint_path / "metadata.json"
-        if metadata_file.exists():
-            metadata = json.loads(metadata_file.read_text())
+        # Load metadata and the saved state
+        if entry is not None:
+            metadata, state = entry
+        else:
+            metadata = {}
+            metadata_file = checkpoint_path / "metadata.json"
+            if metadata_file.exists():
+                metadata = json.loads(metadata_file.read_text())
+            state = {
+                name: (checkpoint_path / name).read_text()
+                for name in _ARTIFACTS
+                if (checkpoint_path / name).exists()
+            }
+        
+        if metadata:
             notes.append(f"Restoring checkpoint: {metadata.get('label', checkpoint_id)}")
             notes.append(f"Created: {metadata.get('created_at', 'unknown')}")
         
+        # Nothing to replay if the live configuration still matches
+        if _state_matches(state):
+            notes.append("✓ Current state already matches checkpoint; nothing restored")
+            log_rollback(checkpoint_id, True, notes)
+            return {
+                "ok": True,
+                "restored": False,
+                "skipped": True,
+                "notes": notes,
+                "errors": []
+            }
+        
         # 1. Restore sysctl settings
-        sysctl_file = checkpoint_path / "sysctl.conf"
-        if sysctl_file.exists():
-            sysctl_content = sysctl_file.read_text()
+        sysctl_content = state.get("sysctl.conf")
+        if sysctl_content is not None:
             restored_count = 0
             failed_count = 0
             
-            for line in sysctl_content.split("\n"):
-                line = line.strip()
-                if not line or line.startswith("#") or "=" not in line:
-                    continue
-                
-                # Parse: key = value or key=value
-                if " = " in line:
-                    key, value = line.split(" = ", 1)
-                else:
-                    key, value = line.split("=", 1)
-                
-                key = key.strip()
-                value = value.strip()
-                
-                # Skip read-only or problematic sysctls
-                skip_patterns = [
-                    "kernel.random",
-                    "kernel.ns_last_pid",
-                    "fs.inode-state",
-                    "fs.file-",
-                    "kernel.pty.nr",
-                    "kernel.sched_domain",
-                    "dev.cdrom",
-                    "kernel.core_pipe_limit"
-                ]
-                
-                if any(pattern in key for pattern in skip_patterns):
-                    continue
-                
+            for key, value in _restorable_sysctls(sysctl_content):
                 # Try to set the value (requires sudo)
                 success, stdout, stderr = _run_command(["sysctl", "-w", f"{key}={value}"], use_sudo=True)
                 if success:
@@ -223,9 +444,8 @@ def rollback_to_checkpoint(checkpoint_id: str) -> dict:
             notes.append(f"✓ Restored {restored_count} sysctl settings ({failed_count} failed/skipped)")
         
         # 2. Restore tc configuration
-        tc_file = checkpoint_path / "tc_config.json"
-        if tc_file.exists():
-            tc_data = json.loads(tc_file.read_text())
+        if "tc_config.json" in state:
+            tc_data = json.loads(state["tc_config.json"])
             
             # First, clear existing tc rules
             success, stdout, stderr = _run_command(["ip", "link", "show"])
@@ -245,9 +465,8 @@ def rollback_to_checkpoint(checkpoint_id: str) -> dict:
             # For now, we've cleared it to baseline state
         
         # 3. Restore nftables
-        nft_file = checkpoint_path / "nft_ruleset.txt"
-        if nft_file.exists():
-            nft_content = nft_file.read_text()
+        nft_content = state.get("nft_ruleset.txt")
+        if nft_content is not None:
             
             # Clear existing rules (requires sudo)
             _run_command(["nft", "flush", "ruleset"], use_sudo=True)
@@ -268,9 +487,8 @@ def rollback_to_checkpoint(checkpoint_id: str) -> dict:
                 errors.append(f"Failed to restore nftables: {stderr}")
         
         # 4. Restore ethtool settings
-        ethtool_file = checkpoint_path / "ethtool_settings.json"
-        if ethtool_file.exists():
-            ethtool_data = json.loads(ethtool_file.read_text())
+        if "ethtool_settings.json" in state:
+            ethtool_data = json.loads(state["ethtool_settings.json"])
             
             # Parse and restore offload settings
             for key, content in ethtool_data.items():
@@ -290,9 +508,8 @@ def rollback_to_checkpoint(checkpoint_id: str) -> dict:
             notes.append("✓ Restored ethtool offload settings")
         
         # 5. Restore MTU and interface settings
-        ip_link_file = checkpoint_path / "ip_link.txt"
-        if ip_link_file.exists():
-            ip_link_content = ip_link_file.read_text()
+        ip_link_content = state.get("ip_link.txt")
+        if ip_link_content is not None:
             
             # Parse and restore MTU
             for line in ip_link_content.split("\n"):
@@ -353,6 +570,8 @@ def list_checkpoints() -> dict:
                 metadata_file = checkpoint_dir / "metadata.json"
                 if metadata_file.exists():
                     metadata = json.loads(metadata_file.read_text())
+                    # File hashes are only used to hard-link unchanged files
+                    metadata.pop("artifacts", None)
                     checkpoints.append(metadata)
                 else:
                     # Checkpoint without metadata
@@ -362,6 +581,9 @@ def list_checkpoints() -> dict:
                         "created_at": "Unknown"
                     })
         
+        with _memory_lock:
+            checkpoints.extend(metadata for metadata, _ in _memory_checkpoints.values())
+        
         return {
             "ok": True,
             "count": len(checkpoints),
@@ -379,6 +601,13 @@ def delete_checkpoint(checkpoint_id: str) -> dict:
     if not isinstance(checkpoint_id, str) or not checkpoint_id:
         return {"ok": False, "notes": "invalid checkpoint_id"}
     
+    if checkpoint_id.startswith(MEMORY_PREFIX):
+        with _memory_lock:
+            removed = _memory_checkpoints.pop(checkpoint_id, None)
+        if removed is None:
+            return {"ok": False, "notes": f"Checkpoint '{checkpoint_id}' not found"}
+        return {"ok": True, "notes": f"Deleted checkpoint: {checkpoint_id}"}
+    
     checkpoint_path = CHECKPOINT_DIR / checkpoint_id
     
     if not checkpoint_path.exists():
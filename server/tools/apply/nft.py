@@ -1,8 +1,10 @@
 from server.tools.util.shell import run
 from server.tools.util.resp import resp
+from server.tools.util.cache import invalidate_all
 import tempfile, os
 
 def apply_nft_ruleset(ruleset: str) -> dict:
+	invalidate_all()
 	try:
 		with tempfile.NamedTemporaryFile("w", delete=False) as f:
 			f.write(ruleset)
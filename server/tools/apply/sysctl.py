@@ -1,7 +1,9 @@
 from server.tools.util.shell import run
 from server.tools.util.resp import resp
+from server.tools.util.cache import invalidate_all
 
 def set_sysctl(kv: dict[str, str]) -> dict:
+	invalidate_all()
 	try:
 		outputs: list[str] = []
 		for k, v in sorted(kv.items()):
@@ -1,7 +1,9 @@
 from server.tools.util.shell import run
 from server.tools.util.resp import resp
+from server.tools.util.cache import invalidate_all
 
 def apply_tc_script(lines: list[str]) -> dict:
+	invalidate_all()
 	try:
 		outputs: list[str] = []
 		for line in lines:
@@ -1,12 +1,16 @@
-import json
+import bisect
 import logging
+import threading
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
+from server.tools.util.jsonutil import dumps, loads
 
 AUDIT_DIR = Path.home() / ".mcp-net-optimizer" / "audit_logs"
 CURRENT_LOG = AUDIT_DIR / "current.log"
 AUDIT_JSON = AUDIT_DIR / "audit_log.json"
+AUDIT_JSONL = AUDIT_DIR / "audit_log.jsonl"
 
 
 def _ensure_audit_dir():
@@ -20,10 +24,36 @@ def _rotate_log_if_needed():
         CURRENT_LOG.rename(archive_name)
 
 
+def _migrate_json_log():
+    """Convert the old single-array JSON log to one entry per line."""
+    if not AUDIT_JSON.exists() or AUDIT_JSONL.exists():
+        return
+    try:
+        entries = loads(AUDIT_JSON.read_bytes())
+    except ValueError:
+        entries = []
+    with open(AUDIT_JSONL, 'w') as f:
+        f.write("".join(dumps(e) + "\n" for e in entries))
+    try:
+        AUDIT_JSON.rename(AUDIT_JSON.with_suffix(".json.migrated"))
+    except FileNotFoundError:
+        # Another process already finished the migration
+        pass
+
+
 class AuditLogger:
     def __init__(self):
         _ensure_audit_dir()
         _rotate_log_if_needed()
+        _migrate_json_log()
+        
+        # Serialises appends to the JSON lines log across threads
+        self._lock = threading.Lock()
+        
+        # action -> sorted [(timestamp, byte offset)], built on the first
+        # action search and extended from _index_end on later ones
+        self._by_action: Dict[str, List[tuple]] = {}
+        self._index_end = 0
         
         # Setup text logger
         self.logger = logging.getLogger("mcp_net_optimizer_audit")
@@ -209,38 +239,89 @@ class AuditLogger:
         )
     
     def _write_json_entry(self, entry: Dict):
-        """Write an entry to the JSON audit log."""
-        try:
-            # Read existing entries
-            if AUDIT_JSON.exists():
-                try:
-                    with open(AUDIT_JSON, 'r') as f:
-                        entries = json.load(f)
-                except json.JSONDecodeError:
-                    entries = []
-            else:
-                entries = []
-            
-            # Append new entry
-            entries.append(entry)
+        """Append an entry to the JSON lines audit log."""
+        with self._lock:
+            try:
+                with open(AUDIT_JSONL, 'a') as f:
+                    f.write(dumps(entry) + "\n")
             
-            # Write back to file
-            with open(AUDIT_JSON, 'w') as f:
-                json.dump(entries, f, indent=2)
+            except Exception as e:
+                # Don't let logging failures break the application
+                self.logger.error(f"Failed to write JSON audit entry: {e}")
+    
+    def _read_entries(self, limit: Optional[int] = None, needles: List[bytes] = ()) -> List[Dict]:
+        """Parse the audit log, only decoding the last `limit` lines if given.
         
-        except Exception as e:
-            # Don't let logging failures break the application
-            self.logger.error(f"Failed to write JSON audit entry: {e}")
+        Lines not containing every byte string in `needles` are skipped
+        without being decoded.
+        """
+        with open(AUDIT_JSONL, 'rb') as f:
+            lines = deque(f, maxlen=limit) if limit else f.readlines()
+        entries = []
+        for line in lines:
+            if needles and not all(n in line for n in needles):
+                continue
+            try:
+                entries.append(loads(line))
+            except ValueError:
+                # Skip a line left truncated by an interrupted write
+                continue
+        return entries
+    
+    def _update_index(self):
+        """Index any complete lines appended since the last call."""
+        with open(AUDIT_JSONL, 'rb') as f:
+            f.seek(0, 2)
+            if f.tell() < self._index_end:
+                # File was replaced or truncated; start over
+                self._by_action.clear()
+                self._index_end = 0
+            f.seek(self._index_end)
+            offset = self._index_end
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    entry = None
+                if isinstance(entry, dict):
+                    # Old migrated entries may lack a string timestamp; they
+                    # sort first instead of breaking the comparisons
+                    ts = entry.get("timestamp")
+                    key = (ts if isinstance(ts, str) else "", offset)
+                    bisect.insort(self._by_action.setdefault(entry.get("action"), []), key)
+                offset += len(line)
+            self._index_end = offset
+    
+    def _indexed_entries(
+        self,
+        action: str,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> List[Dict]:
+        """Load one action's entries within the date range via the index."""
+        with self._lock:
+            self._update_index()
+            rows = self._by_action.get(action, [])
+            lo = bisect.bisect_left(rows, (start_date,)) if start_date else 0
+            hi = bisect.bisect_right(rows, (end_date, float("inf"))) if end_date else len(rows)
+            offsets = [off for _, off in rows[lo:hi]]
+        
+        entries = []
+        with open(AUDIT_JSONL, 'rb') as f:
+            for off in offsets:
+                f.seek(off)
+                entries.append(loads(f.readline()))
+        return entries
     
     def get_recent_entries(self, limit: int = 50) -> List[Dict]:
         """Get recent audit log entries."""
-        if not AUDIT_JSON.exists():
+        if not AUDIT_JSONL.exists():
             return []
         
         try:
-            with open(AUDIT_JSON, 'r') as f:
-                entries = json.load(f)
-            return entries[-limit:] if len(entries) > limit else entries
+            return self._read_entries(limit)
         except Exception as e:
             self.logger.error(f"Failed to read audit log: {e}")
             return []
@@ -253,43 +334,56 @@ class AuditLogger:
         end_date: Optional[str] = None
     ) -> List[Dict]:
         """Search audit log entries by criteria."""
-        if not AUDIT_JSON.exists():
+        if not AUDIT_JSONL.exists():
             return []
         
         try:
-            with open(AUDIT_JSON, 'r') as f:
-                entries = json.load(f)
-            
-            filtered = entries
-            
             if action:
-                filtered = [e for e in filtered if e.get("action") == action]
+                entries = self._indexed_entries(action, start_date, end_date)
+                if checkpoint_id:
+                    entries = [e for e in entries if e.get("checkpoint_id") == checkpoint_id]
+                return entries
             
-            if checkpoint_id:
-                filtered = [e for e in filtered if e.get("checkpoint_id") == checkpoint_id]
+            # Entries are written compactly by dumps, so an exact-match filter
+            # can reject most lines on their raw bytes before decoding. Only
+            # ASCII ids are pre-filtered: older lines may hold non-ASCII
+            # escaped, and the parsed-field check below still applies
+            needles = []
+            if checkpoint_id and checkpoint_id.isascii():
+                needles.append(f'"checkpoint_id":{dumps(checkpoint_id)}'.encode())
+            entries = self._read_entries(needles=needles)
             
+            # Only the filters actually given are checked, in a single pass
+            preds = []
             if start_date:
-                filtered = [e for e in filtered if e.get("timestamp", "") >= start_date]
-            
+                preds.append(lambda e: e.get("timestamp", "") >= start_date)
             if end_date:
-                filtered = [e for e in filtered if e.get("timestamp", "") <= end_date]
+                preds.append(lambda e: e.get("timestamp", "") <= end_date)
+            if checkpoint_id:
+                preds.append(lambda e: e.get("checkpoint_id") == checkpoint_id)
             
-            return filtered
+            if not preds:
+                return entries
+            return [e for e in entries if all(p(e) for p in preds)]
         
         except Exception as e:
             self.logger.error(f"Failed to search audit log: {e}")
             return []
 
 
-# Global singleton instance
+# Global singleton instance; tools run in worker threads, so creation (and
+# the one-time log migration it does) is guarded
 _audit_logger = None
+_audit_logger_lock = threading.Lock()
 
 
 def get_audit_logger() -> AuditLogger:
     """Get the global audit logger instance."""
     global _audit_logger
     if _audit_logger is None:
-        _audit_logger = AuditLogger()
+        with _audit_logger_lock:
+            if _audit_logger is None:
+                _audit_logger = AuditLogger()
     return _audit_logger
 
 
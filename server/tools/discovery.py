@@ -1,10 +1,274 @@
+import functools
+import re
+import socket
+from concurrent.futures import ThreadPoolExecutor
 from server.tools.util.shell import run
 from server.tools.util.resp import resp
+from server.tools.util.cache import ttl_cache, single_flight
 
-def ip_info() -> dict:
+# Idempotent reads are cached briefly so repeated calls within one planning
+# turn skip the fork/exec; apply and rollback paths invalidate the cache.
+# Slow probes are also single-flight, so concurrent identical calls share
+# one subprocess instead of each spawning their own
+CACHE_TTL = 5
+
+# Output parsers are compiled once at import
+_SS_ROW = re.compile(
+    r"^(?:(?P<netid>\S+)\s+)?(?P<state>\S+)\s+(?P<recv_q>\d+)\s+(?P<send_q>\d+)\s+"
+    r"(?P<local>\S+)\s+(?P<peer>\S+)(?:\s+(?P<process>.*\S))?\s*$"
+)
+
+def _parse_ss(stdout: str) -> list[dict]:
+    rows = []
+    for line in stdout.splitlines():
+        m = _SS_ROW.match(line)
+        if m:
+            row = m.groupdict()
+            row["recv_q"] = int(row["recv_q"])
+            row["send_q"] = int(row["send_q"])
+            rows.append(row)
+    return rows
+
+_IFACE_LINE = re.compile(
+    r"^\d+:\s+(?P<name>[^:@\s]+)(?:@\S+)?:\s+<(?P<flags>[^>]*)>"
+    r"(?:.*?\bmtu (?P<mtu>\d+))?(?:.*?\bstate (?P<state>\S+))?"
+)
+_LINK_LINE = re.compile(r"^\s+link/(?P<type>\S+)(?:\s+(?P<mac>\S+))?")
+_ADDR_LINE = re.compile(r"^\s+(?P<family>inet6?)\s+(?P<cidr>\S+)(?:.*?\bscope (?P<scope>\S+))?")
+
+def _parse_ip_addr(stdout: str) -> list[dict]:
+    rows = []
+    for line in stdout.splitlines():
+        m = _IFACE_LINE.match(line)
+        if m:
+            rows.append({
+                "name": m["name"],
+                "flags": m["flags"].split(",") if m["flags"] else [],
+                "mtu": int(m["mtu"]) if m["mtu"] else None,
+                "state": m["state"],
+                "link_type": None,
+                "mac": None,
+                "addresses": [],
+            })
+            continue
+        if not rows:
+            continue
+        m = _ADDR_LINE.match(line)
+        if m:
+            rows[-1]["addresses"].append(m.groupdict())
+            continue
+        m = _LINK_LINE.match(line)
+        if m:
+            rows[-1]["link_type"] = m["type"]
+            rows[-1]["mac"] = m["mac"]
+    return rows
+
+_ROUTE_KEYS = frozenset(("via", "dev", "proto", "scope", "src", "metric", "table", "mtu", "pref"))
+
+def _parse_ip_route(stdout: str) -> list[dict]:
+    rows = []
+    for line in stdout.splitlines():
+        tokens = line.split()
+        if not tokens:
+            continue
+        row = {"dst": tokens[0], "flags": []}
+        i = 1
+        while i < len(tokens):
+            if tokens[i] in _ROUTE_KEYS and i + 1 < len(tokens):
+                row[tokens[i]] = tokens[i + 1]
+                i += 2
+            else:
+                row["flags"].append(tokens[i])
+                i += 1
+        rows.append(row)
+    return rows
+
+def _parse_ip_neigh(stdout: str) -> list[dict]:
+    rows = []
+    for line in stdout.splitlines():
+        tokens = line.split()
+        if not tokens:
+            continue
+        row = {"address": tokens[0], "dev": None, "lladdr": None, "state": None, "router": False}
+        i = 1
+        while i < len(tokens):
+            if tokens[i] in ("dev", "lladdr") and i + 1 < len(tokens):
+                row[tokens[i]] = tokens[i + 1]
+                i += 2
+                continue
+            if tokens[i] == "router":
+                row["router"] = True
+            elif tokens[i].isupper():
+                row["state"] = tokens[i]
+            i += 1
+        rows.append(row)
+    return rows
+
+_ARP_ROW = re.compile(
+    r"^(?P<address>\S+)\s+(?:\(incomplete\)|(?P<hwtype>\S+)\s+(?P<hwaddress>\S+)\s+(?P<flags>\S+)"
+    r"(?:\s+(?P<mask>\S+))?)\s+(?P<iface>\S+)\s*$"
+)
+
+def _parse_arp(stdout: str) -> list[dict]:
+    rows = []
+    for line in stdout.splitlines()[1:]:  # skip the column header
+        m = _ARP_ROW.match(line)
+        if m:
+            rows.append(m.groupdict())
+    return rows
+
+_QDISC_LINE = re.compile(r"^qdisc (?P<kind>\S+) (?P<handle>\S+) (?:(?P<root>root)|parent (?P<parent>\S+))")
+_QDISC_SENT = re.compile(
+    r"^\s*Sent (?P<bytes>\d+) bytes (?P<packets>\d+) pkt \(dropped (?P<dropped>\d+), "
+    r"overlimits (?P<overlimits>\d+) requeues (?P<requeues>\d+)\)"
+)
+_QDISC_BACKLOG = re.compile(r"^\s*backlog (?P<backlog_bytes>\S+) (?P<backlog_packets>\d+)p")
+
+def _parse_tc_qdisc(stdout: str) -> list[dict]:
+    rows = []
+    for line in stdout.splitlines():
+        m = _QDISC_LINE.match(line)
+        if m:
+            rows.append({
+                "kind": m["kind"],
+                "handle": m["handle"],
+                "parent": "root" if m["root"] else m["parent"],
+                "options": line[m.end():].strip(),
+            })
+            continue
+        if not rows:
+            continue
+        m = _QDISC_SENT.match(line)
+        if m:
+            rows[-1].update({k: int(v) for k, v in m.groupdict().items()})
+            continue
+        m = _QDISC_BACKLOG.match(line)
+        if m:
+            rows[-1]["backlog_bytes"] = m["backlog_bytes"]
+            rows[-1]["backlog_packets"] = int(m["backlog_packets"])
+    return rows
+
+# Netlink (pyroute2) lets ip_info/ip_route/ip_neigh read structured records
+# straight from the kernel instead of forking ip and parsing its text. It is
+# optional; without it, or on any netlink error, the subprocess path is used.
+_IFF_FLAGS = (
+    (0x1, "UP"), (0x2, "BROADCAST"), (0x8, "LOOPBACK"), (0x10, "POINTOPOINT"),
+    (0x80, "NOARP"), (0x100, "PROMISC"), (0x1000, "MULTICAST"), (0x10000, "LOWER_UP"),
+)
+_ARPHRD = {1: "ether", 772: "loopback", 65534: "none"}
+_RT_SCOPES = {0: "global", 200: "site", 253: "link", 254: "host"}
+_RT_PROTOS = {2: "kernel", 3: "boot", 4: "static", 16: "dhcp"}
+_NUD_STATES = (
+    (0x80, "PERMANENT"), (0x02, "REACHABLE"), (0x04, "STALE"), (0x08, "DELAY"),
+    (0x10, "PROBE"), (0x20, "FAILED"), (0x01, "INCOMPLETE"),
+)
+_NUD_NOARP = 0x40
+_NTF_ROUTER = 0x80
+_RT_TABLE_MAIN = 254
+
+@functools.cache
+def _iproute_cls():
+    try:
+        from pyroute2 import IPRoute
+    except ImportError:
+        return None
+    return IPRoute
+
+def _netlink_addr(ipr, names: dict) -> list[dict]:
+    rows = {}
+    for link in ipr.get_links():
+        flags = link["flags"]
+        rows[link["index"]] = {
+            "name": names[link["index"]],
+            "flags": [name for bit, name in _IFF_FLAGS if flags & bit],
+            "mtu": link.get_attr("IFLA_MTU"),
+            "state": link.get_attr("IFLA_OPERSTATE"),
+            "link_type": _ARPHRD.get(link["ifi_type"], str(link["ifi_type"])),
+            "mac": link.get_attr("IFLA_ADDRESS"),
+            "addresses": [],
+        }
+    for addr in ipr.get_addr():
+        row = rows.get(addr["index"])
+        if row is None:
+            continue
+        ip = addr.get_attr("IFA_LOCAL") or addr.get_attr("IFA_ADDRESS")
+        row["addresses"].append({
+            "family": "inet6" if addr["family"] == socket.AF_INET6 else "inet",
+            "cidr": f"{ip}/{addr['prefixlen']}",
+            "scope": _RT_SCOPES.get(addr["scope"], str(addr["scope"])),
+        })
+    return list(rows.values())
+
+def _netlink_route(ipr, names: dict) -> list[dict]:
+    # Same view as `ip route show`: IPv4, main table, default fields omitted
+    rows = []
+    for route in ipr.get_routes(family=socket.AF_INET):
+        if (route.get_attr("RTA_TABLE") or route["table"]) != _RT_TABLE_MAIN:
+            continue
+        dst_len = route["dst_len"]
+        dst = route.get_attr("RTA_DST")
+        row = {"dst": "default" if dst_len == 0 else (dst if dst_len == 32 else f"{dst}/{dst_len}"), "flags": []}
+        if route.get_attr("RTA_GATEWAY"):
+            row["via"] = route.get_attr("RTA_GATEWAY")
+        if route.get_attr("RTA_OIF") in names:
+            row["dev"] = names[route.get_attr("RTA_OIF")]
+        if route["proto"] != 3:
+            row["proto"] = _RT_PROTOS.get(route["proto"], str(route["proto"]))
+        if route["scope"] != 0:
+            row["scope"] = _RT_SCOPES.get(route["scope"], str(route["scope"]))
+        if route.get_attr("RTA_PREFSRC"):
+            row["src"] = route.get_attr("RTA_PREFSRC")
+        if route.get_attr("RTA_PRIORITY"):
+            row["metric"] = str(route.get_attr("RTA_PRIORITY"))
+        rows.append(row)
+    return rows
+
+def _netlink_neigh(ipr, names: dict) -> list[dict]:
+    rows = []
+    for neigh in ipr.get_neighbours():
+        state = neigh["state"]
+        if not state or state & _NUD_NOARP:
+            continue
+        rows.append({
+            "address": neigh.get_attr("NDA_DST"),
+            "dev": names.get(neigh["ifindex"]),
+            "lladdr": neigh.get_attr("NDA_LLADDR"),
+            "state": next((name for bit, name in _NUD_STATES if state & bit), None),
+            "router": bool(neigh["flags"] & _NTF_ROUTER),
+        })
+    return rows
+
+def _netlink_resp(reader, structured: bool, include_raw: bool) -> dict | None:
+    # Netlink only replaces the text path when no raw stdout was asked for
+    IPRoute = _iproute_cls()
+    if not structured or include_raw or IPRoute is None:
+        return None
     try:
+        with IPRoute() as ipr:
+            names = {link["index"]: link.get_attr("IFLA_IFNAME") for link in ipr.get_links()}
+            r = resp(True, 0)
+            r["rows"] = reader(ipr, names)
+            return r
+    except Exception:
+        return None
+
+def _with_rows(r: dict, parser, structured: bool, include_raw: bool) -> dict:
+    # Structured rows encode smaller and faster than the escaped stdout text,
+    # which is dropped unless include_raw is set
+    if structured and r["ok"]:
+        r["rows"] = parser(r["stdout"])
+        if not include_raw:
+            r["stdout"] = ""
+    return r
+
+@ttl_cache(CACHE_TTL)
+def ip_info(structured: bool = False, include_raw: bool = False) -> dict:
+    try:
+        r = _netlink_resp(_netlink_addr, structured, include_raw)
+        if r is not None:
+            return r
         r = run(["ip", "addr", "show"], timeout=5)
-        return resp(**r)
+        return _with_rows(resp(**r), _parse_ip_addr, structured, include_raw)
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
@@ -26,42 +290,55 @@ def iwconfig(iface: str = "wlan0") -> dict:
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@single_flight
 def iwlist_scan(iface: str = "wlan0", subcmd: str = "scan") -> dict:
     try:
         return resp(**run(["iwlist", iface, subcmd], timeout=10))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@ttl_cache(CACHE_TTL)
 def hostnamectl() -> dict:
     try:
         return resp(**run(["hostnamectl", "status"], timeout=5))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
-def arp_table() -> dict:
+@ttl_cache(CACHE_TTL)
+def arp_table(structured: bool = False, include_raw: bool = False) -> dict:
     try:
-        return resp(**run(["arp", "-n"], timeout=5))
+        return _with_rows(resp(**run(["arp", "-n"], timeout=5)), _parse_arp, structured, include_raw)
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
-def ip_neigh() -> dict:
+@ttl_cache(CACHE_TTL)
+def ip_neigh(structured: bool = False, include_raw: bool = False) -> dict:
     try:
-        return resp(**run(["ip", "neigh", "show"], timeout=5))
+        r = _netlink_resp(_netlink_neigh, structured, include_raw)
+        if r is not None:
+            return r
+        return _with_rows(resp(**run(["ip", "neigh", "show"], timeout=5)), _parse_ip_neigh, structured, include_raw)
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
-def ip_route() -> dict:
+@ttl_cache(CACHE_TTL)
+def ip_route(structured: bool = False, include_raw: bool = False) -> dict:
     try:
-        return resp(**run(["ip", "route", "show"], timeout=5))
+        r = _netlink_resp(_netlink_route, structured, include_raw)
+        if r is not None:
+            return r
+        return _with_rows(resp(**run(["ip", "route", "show"], timeout=5)), _parse_ip_route, structured, include_raw)
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@ttl_cache(CACHE_TTL)
 def resolvectl_status() -> dict:
     try:
         return resp(**run(["resolvectl", "status"], timeout=5))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@ttl_cache(CACHE_TTL)
 def cat_resolv_conf() -> dict:
     try:
         return resp(**run(["cat", "/etc/resolv.conf"], timeout=5))
@@ -90,50 +367,93 @@ def nslookup(domain: str) -> dict:
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@single_flight
 def ping_host(address: str, count: int = 3) -> dict:
     try:
         return resp(**run(["ping", "-c", str(count), address], timeout=5 + count))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@single_flight
 def traceroute(domain: str) -> dict:
     try:
         return resp(**run(["traceroute", domain], timeout=20))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@single_flight
 def tracepath(domain: str) -> dict:
     try:
         return resp(**run(["tracepath", domain], timeout=20))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
-def ss_summary(options: str = "tulwn") -> dict:
+def ss_summary(options: str = "tulwn", structured: bool = False, include_raw: bool = False) -> dict:
     try:
-        return resp(**run(["ss", f"-{options}"], timeout=5))
+        return _with_rows(resp(**run(["ss", f"-{options}"], timeout=5)), _parse_ss, structured, include_raw)
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
-def tc_qdisc_show(iface: str) -> dict:
+def tc_qdisc_show(iface: str, structured: bool = False, include_raw: bool = False) -> dict:
     try:
-        return resp(**run(["tc", "-s", "qdisc", "show", "dev", iface], timeout=5))
+        r = run(["tc", "-s", "qdisc", "show", "dev", iface], timeout=5)
+        return _with_rows(resp(**r), _parse_tc_qdisc, structured, include_raw)
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@ttl_cache(CACHE_TTL)
+@single_flight
 def nft_list_ruleset() -> dict:
     try:
         return resp(**run(["nft", "list", "ruleset"], timeout=5))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@ttl_cache(CACHE_TTL)
+@single_flight
 def iptables_list() -> dict:
     try:
         return resp(**run(["iptables", "-L", "-v", "-n"], timeout=5))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
 
+@ttl_cache(CACHE_TTL)
 def hostname_ips() -> dict:
     try:
         return resp(**run(["hostname", "-I"], timeout=5))
     except Exception as e:
         return resp(False, 1, stderr=str(e))
+
+# Discovery probes in tool registration order; discover_all dispatches to these
+PROBES = (
+    "ip_info", "eth_info", "hostname_ips", "hostnamectl", "nmcli_status",
+    "iwconfig", "iwlist_scan", "arp_table", "ip_neigh", "ip_route",
+    "resolvectl_status", "cat_resolv_conf", "dig", "host", "nslookup",
+    "ping_host", "traceroute", "tracepath", "ss_summary", "tc_qdisc_show",
+    "nft_list_ruleset", "iptables_list",
+)
+
+def discover_all(spec: dict) -> dict:
+    """
+    Run several discovery probes concurrently and return their results by name.
+    Each key of spec names a discovery tool; its value is True to use the
+    defaults or a dict of keyword arguments, e.g. {"ip_info": True, "eth_info": {"iface": "eth0"}}.
+    """
+    jobs = {}
+    results = {}
+    for name, kwargs in spec.items():
+        if name not in PROBES:
+            results[name] = resp(False, 1, stderr=f"Unknown discovery tool: {name}")
+        elif kwargs is not False:
+            jobs[name] = (globals()[name], kwargs if isinstance(kwargs, dict) else {})
+    
+    if jobs:
+        # Probes are subprocess-bound, so threads run them in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as pool:
+            futures = {name: pool.submit(func, **kwargs) for name, (func, kwargs) in jobs.items()}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = resp(False, 1, stderr=str(e))
+    return results
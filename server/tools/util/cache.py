@@ -0,0 +1,76 @@
+import functools
+import threading
+import time
+from concurrent.futures import Future
+
+_caches: list[dict] = []
+_lock = threading.Lock()
+# Bumped by invalidate_all() so calls that started before an invalidation
+# don't store their now-stale result
+_generation = 0
+
+def ttl_cache(seconds: float):
+    """
+    Cache a function's successful (`ok`) results per argument tuple for
+    `seconds`. Callers get a shallow copy, so they can't alter the cached dict.
+    """
+    def decorator(func):
+        cache: dict = {}
+        _caches.append(cache)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            hit = cache.get(key)
+            if hit is not None and now - hit[0] < seconds:
+                return dict(hit[1])
+            generation = _generation
+            result = func(*args, **kwargs)
+            # Failures (timeouts, tools not ready yet) are retried next call
+            if isinstance(result, dict) and result.get("ok"):
+                with _lock:
+                    if generation == _generation:
+                        cache[key] = (now, dict(result))
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+def single_flight(func):
+    """Let concurrent calls with the same arguments share one execution."""
+    inflight: dict = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        with lock:
+            future = inflight.get(key)
+            leader = future is None
+            if leader:
+                future = inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with lock:
+                del inflight[key]
+
+    return wrapper
+
+def invalidate_all() -> None:
+    """Drop every cached result, e.g. after the system configuration changed."""
+    global _generation
+    with _lock:
+        _generation += 1
+        for cache in _caches:
+            cache.clear()
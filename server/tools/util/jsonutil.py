@@ -0,0 +1,21 @@
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(obj, indent: bool = False) -> str:
+    """Serialise obj to JSON text, through orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode()
+    # ensure_ascii=False matches orjson's raw UTF-8 output byte for byte
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+def loads(data):
+    """Parse JSON text or bytes, through orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,26 +1,36 @@
 import yaml
 from pathlib import Path
 
+# libyaml's C loader when PyYAML was built with it, pure Python otherwise
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 class PolicyRegistry:
     def __init__(self, policy_root: str = "policy/config_cards"):
         self.cards = {}
+        self.version = 0
         self.load_cards(policy_root)
 
     def load_cards(self, root: str):
+        # Cards are loaded into a fresh dict and swapped in whole, so readers
+        # never see a partial set and removed files drop out
+        cards = {}
         for pattern in ["*.yml", "*.yaml"]:
             for file in Path(root).glob(pattern):
-                with open(file) as f:
-                    data = yaml.safe_load(f)
+                with open(file, "rb") as f:
+                    data = yaml.load(f, Loader=_Loader)
                     if isinstance(data, list):
                         for card in data:
                             if isinstance(card, dict):
                                 key = card.get("id")
                                 if key:
-                                    self.cards[key] = card
+                                    cards[key] = card
                     elif isinstance(data, dict):
                         key = data.get("id")
                         if key:
-                            self.cards[key] = data
+                            cards[key] = data
+        self.cards = cards
+        # Bumped after the swap so callers can cache data derived from cards
+        self.version += 1
 
     def get(self, key: str):
         return self.cards.get(key)
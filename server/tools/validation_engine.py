@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Dict, List, Optional
 import json
 from server.tools.audit_log import log_validation_test
@@ -15,6 +16,17 @@ OPTIMIZATION_PROFILES = {
 }
 
 
+class Decision(str, Enum):
+    """Validation outcome. A str subclass, so results still serialise and
+    compare as the plain "KEEP"/"ROLLBACK"/"UNCERTAIN" strings."""
+    KEEP = "KEEP"
+    ROLLBACK = "ROLLBACK"
+    UNCERTAIN = "UNCERTAIN"
+    
+    def __str__(self):
+        return self.value
+
+
 class ValidationEngine:
     @staticmethod
     def validate_gaming_profile(before: Dict, after: Dict) -> Dict:
@@ -49,7 +61,7 @@ class ValidationEngine:
         
         if not before_lat.get("available") or not after_lat.get("available"):
             return {
-                "decision": "UNCERTAIN",
+                "decision": Decision.UNCERTAIN,
                 "score": 0,
                 "reasons": ["Latency tests not available for comparison"],
                 "metrics_comparison": {}
@@ -160,22 +172,22 @@ class ValidationEngine:
         
         # Decision logic
         if score >= 60:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes significantly improved gaming performance (score: {score}/100)"
         elif score >= 40:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes moderately improved performance (score: {score}/100)"
         elif score >= 20:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes had mixed results (score: {score}/100) - review metrics"
         elif score >= 0:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes showed minimal benefit (score: {score}/100) - consider rollback"
         elif score >= -20:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes degraded performance (score: {score}/100) - rollback recommended"
         else:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes SIGNIFICANTLY degraded performance (score: {score}/100) - ROLLBACK IMMEDIATELY"
         
         return {
@@ -279,16 +291,16 @@ class ValidationEngine:
         
         # Decision logic
         if score >= 60:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes significantly improved throughput (score: {score}/100)"
         elif score >= 35:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes improved performance (score: {score}/100)"
         elif score >= 15:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes had mixed results (score: {score}/100)"
         else:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes degraded throughput (score: {score}/100) - rollback recommended"
         
         return {
@@ -337,7 +349,7 @@ class ValidationEngine:
         
         if not before_lat.get("available") or not after_lat.get("available"):
             return {
-                "decision": "UNCERTAIN",
+                "decision": Decision.UNCERTAIN,
                 "score": 0,
                 "reasons": ["Latency tests not available for comparison"],
                 "metrics_comparison": {}
@@ -433,16 +445,16 @@ class ValidationEngine:
         
         # Decision logic
         if score >= 60:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes improved video call performance (score: {score}/100)"
         elif score >= 35:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes acceptable for video calls (score: {score}/100)"
         elif score >= 15:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes had mixed results (score: {score}/100)"
         else:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes degraded video call quality (score: {score}/100)"
         
         return {
@@ -475,7 +487,7 @@ class ValidationEngine:
         if not (before_tp.get("available") and after_tp.get("available") and 
                 "throughput_mbps" in before_tp and "throughput_mbps" in after_tp):
             return {
-                "decision": "UNCERTAIN",
+                "decision": Decision.UNCERTAIN,
                 "score": 0,
                 "reasons": ["Throughput test not available (iperf3 server required for bulk transfer validation)"],
                 "metrics_comparison": {}
@@ -541,16 +553,16 @@ class ValidationEngine:
         
         # Decision logic - strict for bulk transfers
         if score >= 70:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes significantly improved bulk transfer performance (score: {score}/100)"
         elif score >= 50:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes improved bulk transfers (score: {score}/100)"
         elif score >= 30:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes had minor impact (score: {score}/100)"
         else:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes degraded bulk transfer performance (score: {score}/100)"
         
         return {
@@ -681,16 +693,16 @@ class ValidationEngine:
         
         # Decision logic
         if score >= 65:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes improved server performance (score: {score}/100)"
         elif score >= 45:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes acceptable for server workload (score: {score}/100)"
         elif score >= 25:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes had mixed results (score: {score}/100)"
         else:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes degraded server performance (score: {score}/100)"
         
         return {
@@ -732,13 +744,13 @@ class ValidationEngine:
         
         # Decision logic
         if score >= 50:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes improved overall performance (score: {score}/100)"
         elif score >= 20:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes had mixed results (score: {score}/100)"
         else:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes degraded performance (score: {score}/100)"
         
         return {
@@ -764,7 +776,7 @@ class ValidationEngine:
         
         if not before_lat.get("available") or not after_lat.get("available"):
             return {
-                "decision": "UNCERTAIN",
+                "decision": Decision.UNCERTAIN,
                 "score": 0,
                 "reasons": ["Latency tests not available"],
                 "metrics_comparison": {}
@@ -805,13 +817,13 @@ class ValidationEngine:
         
         # Decision: Very strict
         if score >= 60:
-            decision = "KEEP"
+            decision = Decision.KEEP
             summary = f"Changes met low-latency requirements (score: {score}/100)"
         elif score >= 20:
-            decision = "UNCERTAIN"
+            decision = Decision.UNCERTAIN
             summary = f"Changes borderline for low-latency (score: {score}/100)"
         else:
-            decision = "ROLLBACK"
+            decision = Decision.ROLLBACK
             summary = f"Changes FAILED low-latency requirements (score: {score}/100)"
         
         return {
@@ -1,5 +1,5 @@
+import math
 import subprocess
-import statistics
 import time
 import json
 from typing import Dict, List, Optional
@@ -20,6 +20,19 @@ def _run_command(cmd: List[str], timeout: int = 30) -> tuple[bool, str, str]:
         return (False, "", str(e))
 
 
+def _mean(samples: List[float]) -> float:
+    """Float mean; statistics.mean works in exact fractions, which is far
+    slower and buys nothing for millisecond timings."""
+    return math.fsum(samples) / len(samples)
+
+
+def _stdev(samples: List[float], mean: float) -> float:
+    """Sample standard deviation, 0.0 for fewer than two samples."""
+    if len(samples) < 2:
+        return 0.0
+    return math.sqrt(math.fsum((x - mean) ** 2 for x in samples) / (len(samples) - 1))
+
+
 def measure_latency(
     host: str = "8.8.8.8",
     count: int = 20,
@@ -93,21 +106,22 @@ def measure_latency(
     packet_loss = ((packets_sent - packets_received) / packets_sent) * 100
     
     # Calculate jitter as standard deviation (proper measure of variability)
-    jitter = statistics.stdev(times) if len(times) > 1 else 0.0
+    avg = _mean(times)
+    jitter = _stdev(times, avg)
     
     return {
         "available": True,
         "host": host,
         "count": len(times),
         "min_ms": min(times),
-        "avg_ms": statistics.mean(times),
+        "avg_ms": avg,
         "max_ms": max(times),
         "jitter_ms": jitter,
         "stddev_ms": jitter,
         "range_ms": max(times) - min(times),
         "packet_loss_percent": packet_loss,
         "raw_times": times,
-        "message": f"Latency: avg={statistics.mean(times):.2f}ms, jitter={jitter:.2f}ms, loss={packet_loss:.1f}%"
+        "message": f"Latency: avg={avg:.2f}ms, jitter={jitter:.2f}ms, loss={packet_loss:.1f}%"
     }
 
 
@@ -152,7 +166,7 @@ def measure_multi_host_latency(
             "message": "All latency tests failed"
         }
     
-    avg_latency = statistics.mean([lat for _, lat in latencies])
+    avg_latency = _mean([lat for _, lat in latencies])
     best_host = min(latencies, key=lambda x: x[1])
     worst_host = max(latencies, key=lambda x: x[1])
     
@@ -289,14 +303,15 @@ def measure_connection_time(
             "message": f"Failed to connect to {url}"
         }
     
+    avg = _mean(connect_times)
     return {
         "available": True,
         "url": url,
         "count": len(connect_times),
-        "avg_connect_ms": statistics.mean(connect_times),
+        "avg_connect_ms": avg,
         "min_connect_ms": min(connect_times),
         "max_connect_ms": max(connect_times),
-        "message": f"Connection time: avg={statistics.mean(connect_times):.2f}ms"
+        "message": f"Connection time: avg={avg:.2f}ms"
     }
 
 
@@ -357,15 +372,16 @@ def measure_dns_resolution(
             "message": f"Failed to query DNS for {domain}"
         }
     
+    avg = _mean(query_times)
     return {
         "available": True,
         "domain": domain,
         "server": server,
         "count": len(query_times),
-        "avg_query_ms": statistics.mean(query_times),
+        "avg_query_ms": avg,
         "min_query_ms": min(query_times),
         "max_query_ms": max(query_times),
-        "message": f"DNS query time: avg={statistics.mean(query_times):.2f}ms"
+        "message": f"DNS query time: avg={avg:.2f}ms"
     }
 
 